@@ -1957,6 +1957,11 @@ RAG_EMBEDDING_BATCH_SIZE = PersistentConfig(
     ),
 )
 
+# Number of embedding batches sent to the Ollama/OpenAI API at once (1 = sequential)
+RAG_EMBEDDING_CONCURRENT_REQUESTS = max(
+    1, int(os.environ.get("RAG_EMBEDDING_CONCURRENT_REQUESTS", "1"))
+)
+
 RAG_EMBEDDING_QUERY_PREFIX = os.environ.get("RAG_EMBEDDING_QUERY_PREFIX", None)
 
 RAG_EMBEDDING_CONTENT_PREFIX = os.environ.get("RAG_EMBEDDING_CONTENT_PREFIX", None)
@@ -1,10 +1,14 @@
 import logging
 import os
+import threading
+from array import array
+from collections import OrderedDict
 from typing import Optional, Union
 
 import requests
-import hashlib
 from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from huggingface_hub import snapshot_download
 from langchain.retrievers import ContextualCompressionRetriever, EnsembleRetriever
@@ -26,6 +30,7 @@ from open_webui.env import (
     ENABLE_FORWARD_USER_INFO_HEADERS,
 )
 from open_webui.config import (
+    RAG_EMBEDDING_CONCURRENT_REQUESTS,
     RAG_EMBEDDING_QUERY_PREFIX,
     RAG_EMBEDDING_CONTENT_PREFIX,
     RAG_EMBEDDING_PREFIX_FIELD_NAME,
@@ -34,6 +39,27 @@ from open_webui.config import (
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["RAG"])
 
+# Shared session so embedding requests reuse pooled keep-alive connections
+# instead of paying a new TCP/TLS handshake per batch
+EMBEDDING_SESSION = requests.Session()
+for _prefix in ("http://", "https://"):
+    EMBEDDING_SESSION.mount(
+        _prefix,
+        HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=32,
+            # Retry rate limiting and transient gateway errors, honouring
+            # Retry-After; embedding requests are safe to resend
+            max_retries=Retry(
+                total=2,
+                backoff_factor=0.2,
+                status_forcelist=[429, 502, 503, 504],
+                allowed_methods=None,
+                raise_on_status=False,
+            ),
+        ),
+    )
+
 
 from typing import Any
 
@@ -77,7 +103,7 @@ def query_doc(
     collection_name: str, query_embedding: list[float], k: int, user: UserModel = None
 ):
     try:
-        log.debug(f"query_doc:doc {collection_name}")
+        log.debug("query_doc:doc %s", collection_name)
         result = VECTOR_DB_CLIENT.search(
             collection_name=collection_name,
             vectors=[query_embedding],
@@ -85,7 +111,7 @@ def query_doc(
         )
 
         if result:
-            log.info(f"query_doc:result {result.ids} {result.metadatas}")
+            log.info("query_doc:result %s %s", result.ids, result.metadatas)
 
         return result
     except Exception as e:
@@ -95,11 +121,11 @@ def query_doc(
 
 def get_doc(collection_name: str, user: UserModel = None):
     try:
-        log.debug(f"get_doc:doc {collection_name}")
+        log.debug("get_doc:doc %s", collection_name)
         result = VECTOR_DB_CLIENT.get(collection_name=collection_name)
 
         if result:
-            log.info(f"query_doc:result {result.ids} {result.metadatas}")
+            log.info("query_doc:result %s %s", result.ids, result.metadatas)
 
         return result
     except Exception as e:
@@ -118,7 +144,7 @@ def query_doc_with_hybrid_search(
     r: float,
 ) -> dict:
     try:
-        log.debug(f"query_doc_with_hybrid_search:doc {collection_name}")
+        log.debug("query_doc_with_hybrid_search:doc %s", collection_name)
         bm25_retriever = BM25Retriever.from_texts(
             texts=collection_result.documents[0],
             metadatas=collection_result.metadatas[0],
@@ -166,8 +192,9 @@ def query_doc_with_hybrid_search(
         }
 
         log.info(
-            "query_doc_with_hybrid_search:result "
-            + f'{result["metadatas"]} {result["distances"]}'
+            "query_doc_with_hybrid_search:result %s %s",
+            result["metadatas"],
+            result["distances"],
         )
         return result
     except Exception as e:
@@ -198,7 +225,7 @@ def merge_get_results(get_results: list[dict]) -> dict:
 
 def merge_and_sort_query_results(query_results: list[dict], k: int) -> dict:
     # Initialize lists to store combined data
-    combined = dict()  # To store documents with unique document hashes
+    combined = dict()  # To store unique documents
 
     for data in query_results:
         distances = data["distances"][0]
@@ -207,17 +234,15 @@ def merge_and_sort_query_results(query_results: list[dict], k: int) -> dict:
 
         for distance, document, metadata in zip(distances, documents, metadatas):
             if isinstance(document, str):
-                doc_hash = hashlib.sha256(
-                    document.encode()
-                ).hexdigest()  # Compute a hash for uniqueness
-
-                if doc_hash not in combined.keys():
-                    combined[doc_hash] = (distance, document, metadata)
+                # Key on the text itself; str hashes are cached, so this avoids
+                # re-encoding and SHA-256 hashing every chunk
+                if document not in combined:
+                    combined[document] = (distance, document, metadata)
                     continue  # if doc is new, no further comparison is needed
 
                 # if doc is alredy in, but new distance is better, update
-                if distance > combined[doc_hash][0]:
-                    combined[doc_hash] = (distance, document, metadata)
+                if distance > combined[document][0]:
+                    combined[document] = (distance, document, metadata)
 
     combined = list(combined.values())
     # Sort the list based on distances
@@ -280,7 +305,9 @@ def query_collection(
     # Generate all query embeddings (in one call)
     query_embeddings = embedding_function(queries, prefix=RAG_EMBEDDING_QUERY_PREFIX)
     log.debug(
-        f"query_collection: processing {len(queries)} queries across {len(collection_names)} collections"
+        "query_collection: processing %d queries across %d collections",
+        len(queries),
+        len(collection_names),
     )
 
     with ThreadPoolExecutor() as executor:
@@ -322,7 +349,8 @@ def query_collection_with_hybrid_search(
     for collection_name in collection_names:
         try:
             log.debug(
-                f"query_collection_with_hybrid_search:VECTOR_DB_CLIENT.get:collection {collection_name}"
+                "query_collection_with_hybrid_search:VECTOR_DB_CLIENT.get:collection %s",
+                collection_name,
             )
             collection_results[collection_name] = VECTOR_DB_CLIENT.get(
                 collection_name=collection_name
@@ -332,7 +360,9 @@ def query_collection_with_hybrid_search(
             collection_results[collection_name] = None
 
     log.info(
-        f"Starting hybrid search for {len(queries)} queries in {len(collection_names)} collections..."
+        "Starting hybrid search for %d queries in %d collections...",
+        len(queries),
+        len(collection_names),
     )
 
     def process_query(collection_name, query):
@@ -379,6 +409,68 @@ def query_collection_with_hybrid_search(
     return merge_and_sort_query_results(results, k=k)
 
 
+def cache_query_embeddings(
+    embedding_function, maxsize: int = 4096, max_batch_size: int = 16
+):
+    """
+    Wrap an embedding function with an LRU cache for queries. Single strings
+    and lists of up to max_batch_size texts are looked up per text, and only
+    the misses are embedded; larger lists bypass the cache. Ingestion callers
+    pass use_cache=False so document and memory texts never evict queries.
+    """
+    cache = OrderedDict()
+    lock = threading.Lock()
+
+    def cached_embedding_function(query, prefix=None, user=None, use_cache=True):
+        if not use_cache:
+            return embedding_function(query, prefix=prefix, user=user)
+
+        if isinstance(query, str):
+            texts = [query]
+        elif isinstance(query, list) and len(query) <= max_batch_size:
+            texts = query
+        else:
+            return embedding_function(query, prefix=prefix, user=user)
+
+        # The user only matters when it is forwarded to the embedding server
+        user_key = user.id if ENABLE_FORWARD_USER_INFO_HEADERS and user else None
+        keys = [(text, prefix, user_key) for text in texts]
+
+        embeddings = {}
+        with lock:
+            for key in keys:
+                if key in cache:
+                    cache.move_to_end(key)
+                    embeddings[key] = cache[key]
+
+        misses = list(dict.fromkeys(key for key in keys if key not in embeddings))
+        if misses:
+            miss_texts = [key[0] for key in misses]
+            result = embedding_function(
+                miss_texts[0] if isinstance(query, str) else miss_texts,
+                prefix=prefix,
+                user=user,
+            )
+            if result is None:
+                return None
+            if isinstance(query, str):
+                result = [result]
+
+            with lock:
+                for key, embedding in zip(misses, result, strict=True):
+                    # Stored as compact float32 buffers (4 B per dimension) that
+                    # are never handed out; callers always get a fresh list
+                    embeddings[key] = cache[key] = array("f", embedding)
+                while len(cache) > maxsize:
+                    cache.popitem(last=False)
+
+        if isinstance(query, str):
+            return embeddings[keys[0]].tolist()
+        return [embeddings[key].tolist() for key in keys]
+
+    return cached_embedding_function
+
+
 def get_embedding_function(
     embedding_engine,
     embedding_model,
@@ -388,9 +480,11 @@ def get_embedding_function(
     embedding_batch_size,
 ):
     if embedding_engine == "":
-        return lambda query, prefix=None, user=None: embedding_function.encode(
-            query, **({"prompt": prefix} if prefix else {})
-        ).tolist()
+        return cache_query_embeddings(
+            lambda query, prefix=None, user=None: embedding_function.encode(
+                query, **({"prompt": prefix} if prefix else {})
+            ).tolist()
+        )
     elif embedding_engine in ["ollama", "openai"]:
         func = lambda query, prefix=None, user=None: generate_embeddings(
             engine=embedding_engine,
@@ -404,21 +498,40 @@ def get_embedding_function(
 
         def generate_multiple(query, prefix, user, func):
             if isinstance(query, list):
+                batches = [
+                    query[i : i + embedding_batch_size]
+                    for i in range(0, len(query), embedding_batch_size)
+                ]
+                workers = min(len(batches), RAG_EMBEDDING_CONCURRENT_REQUESTS)
+                if workers > 1:
+                    # Send batches concurrently; map() preserves the input order
+                    with ThreadPoolExecutor(max_workers=workers) as executor:
+                        batch_embeddings = list(
+                            executor.map(
+                                lambda batch: func(batch, prefix=prefix, user=user),
+                                batches,
+                            )
+                        )
+                else:
+                    batch_embeddings = [
+                        func(batch, prefix=prefix, user=user) for batch in batches
+                    ]
+
                 embeddings = []
-                for i in range(0, len(query), embedding_batch_size):
-                    embeddings.extend(
-                        func(
-                            query[i : i + embedding_batch_size],
-                            prefix=prefix,
-                            user=user,
+                for i, batch in enumerate(batch_embeddings):
+                    if batch is None:
+                        raise Exception(
+                            f"Failed to generate embeddings for batch {i + 1} of {len(batches)}"
                         )
-                    )
+                    embeddings.extend(batch)
                 return embeddings
             else:
                 return func(query, prefix, user)
 
-        return lambda query, prefix=None, user=None: generate_multiple(
-            query, prefix, user, func
+        return cache_query_embeddings(
+            lambda query, prefix=None, user=None: generate_multiple(
+                query, prefix, user, func
+            )
         )
     else:
         raise ValueError(f"Unknown embedding engine: {embedding_engine}")
@@ -437,7 +550,12 @@ def get_sources_from_files(
     full_context=False,
 ):
     log.debug(
-        f"files: {files} {queries} {embedding_function} {reranking_function} {full_context}"
+        "files: %s %s %s %s %s",
+        files,
+        queries,
+        embedding_function,
+        reranking_function,
+        full_context,
     )
 
     extracted_collections = []
@@ -525,7 +643,7 @@ def get_sources_from_files(
 
             collection_names = set(collection_names).difference(extracted_collections)
             if not collection_names:
-                log.debug(f"skipping {file} as it has already been extracted")
+                log.debug("skipping %s as it has already been extracted", file)
                 continue
 
             if full_context:
@@ -609,8 +727,8 @@ def get_model_path(model: str, update_model: bool = False):
         "local_files_only": local_files_only,
     }
 
-    log.debug(f"model: {model}")
-    log.debug(f"snapshot_kwargs: {snapshot_kwargs}")
+    log.debug("model: %s", model)
+    log.debug("snapshot_kwargs: %s", snapshot_kwargs)
 
     # Inspiration from upstream sentence_transformers
     if (
@@ -629,7 +747,7 @@ def get_model_path(model: str, update_model: bool = False):
     # Attempt to query the huggingface_hub library to determine the local path and/or to update
     try:
         model_repo_path = snapshot_download(**snapshot_kwargs)
-        log.debug(f"model_repo_path: {model_repo_path}")
+        log.debug("model_repo_path: %s", model_repo_path)
         return model_repo_path
     except Exception as e:
         log.exception(f"Cannot determine model snapshot path: {e}")
@@ -646,13 +764,15 @@ def generate_openai_batch_embeddings(
 ) -> Optional[list[list[float]]]:
     try:
         log.debug(
-            f"generate_openai_batch_embeddings:model {model} batch size: {len(texts)}"
+            "generate_openai_batch_embeddings:model %s batch size: %d",
+            model,
+            len(texts),
         )
         json_data = {"input": texts, "model": model}
         if isinstance(RAG_EMBEDDING_PREFIX_FIELD_NAME, str) and isinstance(prefix, str):
             json_data[RAG_EMBEDDING_PREFIX_FIELD_NAME] = prefix
 
-        r = requests.post(
+        r = EMBEDDING_SESSION.post(
             f"{url}/embeddings",
             headers={
                 "Content-Type": "application/json",
@@ -691,13 +811,15 @@ def generate_ollama_batch_embeddings(
 ) -> Optional[list[list[float]]]:
     try:
         log.debug(
-            f"generate_ollama_batch_embeddings:model {model} batch size: {len(texts)}"
+            "generate_ollama_batch_embeddings:model %s batch size: %d",
+            model,
+            len(texts),
         )
         json_data = {"input": texts, "model": model}
         if isinstance(RAG_EMBEDDING_PREFIX_FIELD_NAME, str) and isinstance(prefix, str):
             json_data[RAG_EMBEDDING_PREFIX_FIELD_NAME] = prefix
 
-        r = requests.post(
+        r = EMBEDDING_SESSION.post(
             f"{url}/api/embed",
             headers={
                 "Content-Type": "application/json",
@@ -745,39 +867,21 @@ def generate_embeddings(
             text = f"{prefix}{text}"
 
     if engine == "ollama":
-        if isinstance(text, list):
-            embeddings = generate_ollama_batch_embeddings(
-                **{
-                    "model": model,
-                    "texts": text,
-                    "url": url,
-                    "key": key,
-                    "prefix": prefix,
-                    "user": user,
-                }
-            )
-        else:
-            embeddings = generate_ollama_batch_embeddings(
-                **{
-                    "model": model,
-                    "texts": [text],
-                    "url": url,
-                    "key": key,
-                    "prefix": prefix,
-                    "user": user,
-                }
-            )
-        return embeddings[0] if isinstance(text, str) else embeddings
+        generate_batch_embeddings = generate_ollama_batch_embeddings
     elif engine == "openai":
-        if isinstance(text, list):
-            embeddings = generate_openai_batch_embeddings(
-                model, text, url, key, prefix, user
-            )
-        else:
-            embeddings = generate_openai_batch_embeddings(
-                model, [text], url, key, prefix, user
-            )
-        return embeddings[0] if isinstance(text, str) else embeddings
+        generate_batch_embeddings = generate_openai_batch_embeddings
+    else:
+        return None
+
+    embeddings = generate_batch_embeddings(
+        model=model,
+        texts=text if isinstance(text, list) else [text],
+        url=url,
+        key=key,
+        prefix=prefix,
+        user=user,
+    )
+    return embeddings[0] if isinstance(text, str) else embeddings
 
 
 import operator
@@ -58,7 +58,7 @@ async def add_memory(
                 "id": memory.id,
                 "text": memory.content,
                 "vector": request.app.state.EMBEDDING_FUNCTION(
-                    memory.content, user=user
+                    memory.content, user=user, use_cache=False
                 ),
                 "metadata": {"created_at": memory.created_at},
             }
@@ -98,24 +98,40 @@ async def query_memory(
 async def reset_memory_from_vector_db(
     request: Request, user=Depends(get_verified_user)
 ):
-    VECTOR_DB_CLIENT.delete_collection(f"user-memory-{user.id}")
-
     memories = Memories.get_memories_by_user_id(user.id)
+    if not memories:
+        VECTOR_DB_CLIENT.delete_collection(f"user-memory-{user.id}")
+        return True
+
+    # Embed all memories in a single batched call instead of one per memory,
+    # before dropping the existing collection so a failure leaves it intact
+    try:
+        vectors = request.app.state.EMBEDDING_FUNCTION(
+            [memory.content for memory in memories], user=user, use_cache=False
+        )
+    except Exception as e:
+        log.exception(e)
+        vectors = None
+
+    if vectors is None or len(vectors) != len(memories):
+        raise HTTPException(
+            status_code=500, detail="Failed to generate memory embeddings"
+        )
+
+    VECTOR_DB_CLIENT.delete_collection(f"user-memory-{user.id}")
     VECTOR_DB_CLIENT.upsert(
         collection_name=f"user-memory-{user.id}",
         items=[
             {
                 "id": memory.id,
                 "text": memory.content,
-                "vector": request.app.state.EMBEDDING_FUNCTION(
-                    memory.content, user=user
-                ),
+                "vector": vector,
                 "metadata": {
                     "created_at": memory.created_at,
                     "updated_at": memory.updated_at,
                 },
             }
-            for memory in memories
+            for memory, vector in zip(memories, vectors, strict=True)
         ],
     )
 
@@ -167,7 +183,7 @@ async def update_memory_by_id(
                     "id": memory.id,
                     "text": memory.content,
                     "vector": request.app.state.EMBEDDING_FUNCTION(
-                        memory.content, user=user
+                        memory.content, user=user, use_cache=False
                     ),
                     "metadata": {
                         "created_at": memory.created_at,
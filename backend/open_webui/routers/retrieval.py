@@ -131,11 +131,44 @@ def get_ef(
                 model_kwargs=SENTENCE_TRANSFORMERS_MODEL_KWARGS,
             )
         except Exception as e:
-            log.debug(f"Error loading SentenceTransformer: {e}")
+            log.debug("Error loading SentenceTransformer: %s", e)
 
     return ef
 
 
+def get_current_embedding_function(request: Request):
+    """
+    Return app.state.EMBEDDING_FUNCTION, rebuilding it first when the shared
+    embedding config no longer matches the one it was built from, e.g. after
+    the config was changed on another worker through Redis-backed config.
+    """
+    config = request.app.state.config
+    engine = config.RAG_EMBEDDING_ENGINE
+    model = config.RAG_EMBEDDING_MODEL
+    url = (
+        config.RAG_OPENAI_API_BASE_URL
+        if engine == "openai"
+        else config.RAG_OLLAMA_BASE_URL
+    )
+    key = (
+        config.RAG_OPENAI_API_KEY if engine == "openai" else config.RAG_OLLAMA_API_KEY
+    )
+    batch_size = config.RAG_EMBEDDING_BATCH_SIZE
+
+    embedding_config = (engine, model, url, key, batch_size, request.app.state.ef)
+    if (
+        getattr(request.app.state, "EMBEDDING_FUNCTION_CONFIG", None)
+        != embedding_config
+    ):
+        log.info("Rebuilding embedding function for engine: %s", engine)
+        request.app.state.EMBEDDING_FUNCTION = get_embedding_function(
+            engine, model, request.app.state.ef, url, key, batch_size
+        )
+        request.app.state.EMBEDDING_FUNCTION_CONFIG = embedding_config
+
+    return request.app.state.EMBEDDING_FUNCTION
+
+
 def get_rf(
     engine: str = "",
     reranking_model: Optional[str] = None,
@@ -265,7 +298,9 @@ async def update_embedding_config(
     request: Request, form_data: EmbeddingModelUpdateForm, user=Depends(get_admin_user)
 ):
     log.info(
-        f"Updating embedding model: {request.app.state.config.RAG_EMBEDDING_MODEL} to {form_data.embedding_model}"
+        "Updating embedding model: %s to %s",
+        request.app.state.config.RAG_EMBEDDING_MODEL,
+        form_data.embedding_model,
     )
     try:
         request.app.state.config.RAG_EMBEDDING_ENGINE = form_data.embedding_engine
@@ -297,22 +332,7 @@ async def update_embedding_config(
             request.app.state.config.RAG_EMBEDDING_MODEL,
         )
 
-        request.app.state.EMBEDDING_FUNCTION = get_embedding_function(
-            request.app.state.config.RAG_EMBEDDING_ENGINE,
-            request.app.state.config.RAG_EMBEDDING_MODEL,
-            request.app.state.ef,
-            (
-                request.app.state.config.RAG_OPENAI_API_BASE_URL
-                if request.app.state.config.RAG_EMBEDDING_ENGINE == "openai"
-                else request.app.state.config.RAG_OLLAMA_BASE_URL
-            ),
-            (
-                request.app.state.config.RAG_OPENAI_API_KEY
-                if request.app.state.config.RAG_EMBEDDING_ENGINE == "openai"
-                else request.app.state.config.RAG_OLLAMA_API_KEY
-            ),
-            request.app.state.config.RAG_EMBEDDING_BATCH_SIZE,
-        )
+        get_current_embedding_function(request)
 
         return {
             "status": True,
@@ -637,7 +657,9 @@ async def update_rag_config(
     )
 
     log.info(
-        f"Updating reranking model: {request.app.state.config.RAG_RERANKING_MODEL} to {form_data.RAG_RERANKING_MODEL}"
+        "Updating reranking model: %s to %s",
+        request.app.state.config.RAG_RERANKING_MODEL,
+        form_data.RAG_RERANKING_MODEL,
     )
     try:
         request.app.state.config.RAG_RERANKING_MODEL = form_data.RAG_RERANKING_MODEL
@@ -917,9 +939,13 @@ def save_docs_to_vector_db(
 
         return ", ".join(docs_info)
 
-    log.info(
-        f"save_docs_to_vector_db: document {_get_docs_info(docs)} {collection_name}"
-    )
+    # Building the docs summary walks every doc, so skip it when INFO is off
+    if log.isEnabledFor(logging.INFO):
+        log.info(
+            "save_docs_to_vector_db: document %s %s",
+            _get_docs_info(docs),
+            collection_name,
+        )
 
     # Check if entries with the same hash (metadata.hash) already exist
     if metadata and "hash" in metadata:
@@ -931,7 +957,7 @@ def save_docs_to_vector_db(
         if result is not None:
             existing_doc_ids = result.ids[0]
             if existing_doc_ids:
-                log.info(f"Document with hash {metadata['hash']} already exists")
+                log.info("Document with hash %s already exists", metadata["hash"])
                 raise ValueError(ERROR_MESSAGES.DUPLICATE_CONTENT)
 
     if split:
@@ -942,9 +968,12 @@ def save_docs_to_vector_db(
                 add_start_index=True,
             )
         elif request.app.state.config.TEXT_SPLITTER == "token":
-            log.info(
-                f"Using token text splitter: {request.app.state.config.TIKTOKEN_ENCODING_NAME}"
-            )
+            # Avoid an extra (possibly Redis-backed) config read when INFO is off
+            if log.isEnabledFor(logging.INFO):
+                log.info(
+                    "Using token text splitter: %s",
+                    request.app.state.config.TIKTOKEN_ENCODING_NAME,
+                )
 
             tiktoken.get_encoding(str(request.app.state.config.TIKTOKEN_ENCODING_NAME))
             text_splitter = TokenTextSplitter(
@@ -989,39 +1018,24 @@ def save_docs_to_vector_db(
 
     try:
         if VECTOR_DB_CLIENT.has_collection(collection_name=collection_name):
-            log.info(f"collection {collection_name} already exists")
+            log.info("collection %s already exists", collection_name)
 
             if overwrite:
                 VECTOR_DB_CLIENT.delete_collection(collection_name=collection_name)
-                log.info(f"deleting existing collection {collection_name}")
+                log.info("deleting existing collection %s", collection_name)
             elif add is False:
                 log.info(
-                    f"collection {collection_name} already exists, overwrite is False and add is False"
+                    "collection %s already exists, overwrite is False and add is False",
+                    collection_name,
                 )
                 return True
 
-        log.info(f"adding to collection {collection_name}")
-        embedding_function = get_embedding_function(
-            request.app.state.config.RAG_EMBEDDING_ENGINE,
-            request.app.state.config.RAG_EMBEDDING_MODEL,
-            request.app.state.ef,
-            (
-                request.app.state.config.RAG_OPENAI_API_BASE_URL
-                if request.app.state.config.RAG_EMBEDDING_ENGINE == "openai"
-                else request.app.state.config.RAG_OLLAMA_BASE_URL
-            ),
-            (
-                request.app.state.config.RAG_OPENAI_API_KEY
-                if request.app.state.config.RAG_EMBEDDING_ENGINE == "openai"
-                else request.app.state.config.RAG_OLLAMA_API_KEY
-            ),
-            request.app.state.config.RAG_EMBEDDING_BATCH_SIZE,
-        )
-
-        embeddings = embedding_function(
+        log.info("adding to collection %s", collection_name)
+        embeddings = get_current_embedding_function(request)(
             list(map(lambda x: x.replace("\n", " "), texts)),
             prefix=RAG_EMBEDDING_CONTENT_PREFIX,
             user=user,
+            use_cache=False,
         )
 
         items = [
@@ -1170,7 +1184,7 @@ def process_file(
                 ]
             text_content = " ".join([doc.page_content for doc in docs])
 
-        log.debug(f"text_content: {text_content}")
+        log.debug("text_content: %s", text_content)
         Files.update_file_data_by_id(
             file.id,
             {"content": text_content},
@@ -1255,7 +1269,7 @@ def process_text(
         )
     ]
     text_content = form_data.content
-    log.debug(f"text_content: {text_content}")
+    log.debug("text_content: %s", text_content)
 
     result = save_docs_to_vector_db(request, docs, collection_name, user=user)
     if result:
@@ -1288,7 +1302,7 @@ def process_youtube_video(
 
         docs = loader.load()
         content = " ".join([doc.page_content for doc in docs])
-        log.debug(f"text_content: {content}")
+        log.debug("text_content: %s", content)
 
         save_docs_to_vector_db(
             request, docs, collection_name, overwrite=True, user=user
@@ -1332,7 +1346,7 @@ def process_web(
         docs = loader.load()
         content = " ".join([doc.page_content for doc in docs])
 
-        log.debug(f"text_content: {content}")
+        log.debug("text_content: %s", content)
 
         if not request.app.state.config.BYPASS_WEB_SEARCH_EMBEDDING_AND_RETRIEVAL:
             save_docs_to_vector_db(
@@ -1629,7 +1643,7 @@ async def process_web_search(
                         urls.append(item.link)
 
         urls = list(dict.fromkeys(urls))
-        log.debug(f"urls: {urls}")
+        log.debug("urls: %s", urls)
 
     except Exception as e:
         log.exception(e)
@@ -1683,7 +1697,7 @@ async def process_web_search(
                     user=user,
                 )
             except Exception as e:
-                log.debug(f"error saving docs: {e}")
+                log.debug("error saving docs: %s", e)
 
             return {
                 "status": True,
@@ -0,0 +1,195 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from open_webui.retrieval import utils
+
+
+class StubEmbeddingFunction:
+    """Embeds each text as [len(text)] and records every call it receives."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, query, prefix=None, user=None):
+        self.calls.append(query)
+        if isinstance(query, list):
+            return [[len(text)] for text in query]
+        return [len(query)]
+
+
+class TestCacheQueryEmbeddings:
+    def test_single_query_hit_and_miss(self):
+        stub = StubEmbeddingFunction()
+        ef = utils.cache_query_embeddings(stub)
+
+        assert ef("hello") == [5]
+        assert ef("hello") == [5]
+        assert stub.calls == ["hello"]
+
+        assert ef("hello", prefix="query: ") == [5]
+        assert stub.calls == ["hello", "hello"]
+
+    def test_returned_vectors_are_copies(self):
+        stub = StubEmbeddingFunction()
+        ef = utils.cache_query_embeddings(stub)
+
+        ef("hello").append(9)
+        ef(["hello"])[0].append(9)
+        assert ef("hello") == [5]
+        assert stub.calls == ["hello"]
+
+    def test_vectors_are_stored_as_float32(self):
+        ef = utils.cache_query_embeddings(
+            lambda query, prefix=None, user=None: [0.1]
+        )
+
+        miss = ef("hello")
+        hit = ef("hello")
+        assert miss == hit
+        assert isinstance(hit[0], float)
+        assert hit[0] != 0.1  # float32 rounding
+        assert abs(hit[0] - 0.1) < 1e-6
+
+    def test_list_embeds_only_misses_in_order(self):
+        stub = StubEmbeddingFunction()
+        ef = utils.cache_query_embeddings(stub)
+
+        ef("bb")
+        assert ef(["a", "bb", "ccc", "a"]) == [[1], [2], [3], [1]]
+        assert stub.calls == ["bb", ["a", "ccc"]]
+
+        assert ef(["ccc", "bb"]) == [[3], [2]]
+        assert len(stub.calls) == 2
+
+    def test_large_list_bypasses_cache(self):
+        stub = StubEmbeddingFunction()
+        ef = utils.cache_query_embeddings(stub, max_batch_size=2)
+
+        texts = ["a", "bb", "ccc"]
+        assert ef(texts) == [[1], [2], [3]]
+        assert ef(texts) == [[1], [2], [3]]
+        assert stub.calls == [texts, texts]
+
+        ef("a")
+        assert stub.calls[-1] == "a"
+
+    def test_ingestion_does_not_fill_cache(self):
+        stub = StubEmbeddingFunction()
+        ef = utils.cache_query_embeddings(stub, maxsize=2)
+
+        ef("a")
+        ef("bb")
+        assert ef(["chunk one", "chunk two"], use_cache=False) == [[9], [9]]
+        assert ef("memory", use_cache=False) == [6]
+        assert stub.calls == ["a", "bb", ["chunk one", "chunk two"], "memory"]
+
+        # The queries were not evicted, and ingested texts were not stored
+        ef("a")
+        ef("bb")
+        assert len(stub.calls) == 4
+        ef("memory")
+        assert stub.calls[-1] == "memory"
+
+    def test_eviction(self):
+        stub = StubEmbeddingFunction()
+        ef = utils.cache_query_embeddings(stub, maxsize=2)
+
+        ef("a")
+        ef("bb")
+        ef("a")  # refresh "a", making "bb" the least recently used
+        ef("ccc")
+        assert stub.calls == ["a", "bb", "ccc"]
+
+        ef("a")
+        assert len(stub.calls) == 3
+        ef("bb")
+        assert stub.calls[-1] == "bb"
+
+    def test_failures_are_not_cached(self):
+        calls = []
+
+        def failing(query, prefix=None, user=None):
+            calls.append(query)
+            return None
+
+        ef = utils.cache_query_embeddings(failing)
+        assert ef("hello") is None
+        assert ef(["hello"]) is None
+        assert calls == ["hello", ["hello"]]
+
+    def test_user_is_part_of_key_only_when_forwarded(self, monkeypatch):
+        stub = StubEmbeddingFunction()
+        ef = utils.cache_query_embeddings(stub)
+        alice = SimpleNamespace(id="alice")
+        bob = SimpleNamespace(id="bob")
+
+        monkeypatch.setattr(utils, "ENABLE_FORWARD_USER_INFO_HEADERS", False)
+        ef("hello", user=alice)
+        ef("hello", user=bob)
+        assert len(stub.calls) == 1
+
+        monkeypatch.setattr(utils, "ENABLE_FORWARD_USER_INFO_HEADERS", True)
+        ef("hello", user=alice)
+        ef("hello", user=bob)
+        assert len(stub.calls) == 3
+
+
+class TestGenerateMultiple:
+    @staticmethod
+    def get_embedding_function(monkeypatch, generate_embeddings, concurrency):
+        monkeypatch.setattr(utils, "generate_embeddings", generate_embeddings)
+        monkeypatch.setattr(utils, "RAG_EMBEDDING_CONCURRENT_REQUESTS", concurrency)
+        return utils.get_embedding_function(
+            "openai", "model", None, "http://localhost", "", 2
+        )
+
+    def test_sequential_by_default(self, monkeypatch):
+        calls = []
+
+        def generate_embeddings(text, **kwargs):
+            calls.append((text, threading.current_thread()))
+            return [[len(t)] for t in text]
+
+        def no_executor(*args, **kwargs):
+            raise AssertionError("ThreadPoolExecutor should not be used")
+
+        monkeypatch.setattr(utils, "ThreadPoolExecutor", no_executor)
+        ef = self.get_embedding_function(monkeypatch, generate_embeddings, 1)
+
+        texts = ["a", "bb", "ccc", "dddd", "eeeee"]
+        assert ef(texts, use_cache=False) == [[1], [2], [3], [4], [5]]
+        assert [text for text, _ in calls] == [
+            ["a", "bb"],
+            ["ccc", "dddd"],
+            ["eeeee"],
+        ]
+        assert all(thread is threading.main_thread() for _, thread in calls)
+
+    def test_concurrent_batches_keep_input_order(self, monkeypatch):
+        threads = set()
+
+        def generate_embeddings(text, **kwargs):
+            threads.add(threading.current_thread())
+            # Later batches finish first
+            time.sleep(0.05 / len(text[0]))
+            return [[len(t)] for t in text]
+
+        ef = self.get_embedding_function(monkeypatch, generate_embeddings, 4)
+
+        texts = ["a", "bb", "ccc", "dddd", "eeeee", "ffffff", "ggggggg"]
+        assert ef(texts, use_cache=False) == [[len(t)] for t in texts]
+        assert threading.main_thread() not in threads
+
+    def test_failed_batch_raises(self, monkeypatch):
+        def generate_embeddings(text, **kwargs):
+            return None if "ccc" in text else [[len(t)] for t in text]
+
+        for concurrency in (1, 4):
+            ef = self.get_embedding_function(
+                monkeypatch, generate_embeddings, concurrency
+            )
+            with pytest.raises(Exception, match="batch 2 of 3"):
+                ef(["a", "bb", "ccc", "dddd", "eeeee"], use_cache=False)
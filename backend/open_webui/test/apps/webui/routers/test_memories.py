@@ -0,0 +1,80 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi import HTTPException
+
+from open_webui.routers import memories
+
+
+def embed_none(texts, **kwargs):
+    return None
+
+
+def embed_short(texts, **kwargs):
+    return [[len(t)] for t in texts[:-1]]
+
+
+def embed_raises(texts, **kwargs):
+    raise RuntimeError("embedding backend unavailable")
+
+
+class TestResetMemoryFromVectorDB:
+    user = SimpleNamespace(id="1")
+
+    @staticmethod
+    def setup_memories(monkeypatch, embedding_function):
+        stored = [
+            SimpleNamespace(
+                id=str(i), content=f"memory {i}", created_at=0, updated_at=0
+            )
+            for i in range(3)
+        ]
+        monkeypatch.setattr(
+            memories,
+            "Memories",
+            SimpleNamespace(get_memories_by_user_id=lambda user_id: stored),
+        )
+        vector_db_client = MagicMock()
+        monkeypatch.setattr(memories, "VECTOR_DB_CLIENT", vector_db_client)
+
+        request = SimpleNamespace(
+            app=SimpleNamespace(
+                state=SimpleNamespace(EMBEDDING_FUNCTION=embedding_function)
+            )
+        )
+        return request, vector_db_client
+
+    def reset(self, request):
+        return asyncio.run(
+            memories.reset_memory_from_vector_db(request=request, user=self.user)
+        )
+
+    def test_reset_rebuilds_collection(self, monkeypatch):
+        request, vector_db_client = self.setup_memories(
+            monkeypatch, lambda texts, **kwargs: [[len(t)] for t in texts]
+        )
+
+        assert self.reset(request) is True
+        vector_db_client.delete_collection.assert_called_once_with("user-memory-1")
+        items = vector_db_client.upsert.call_args.kwargs["items"]
+        assert [(item["id"], item["vector"]) for item in items] == [
+            ("0", [8]),
+            ("1", [8]),
+            ("2", [8]),
+        ]
+
+    @pytest.mark.parametrize(
+        "embedding_function", [embed_none, embed_short, embed_raises]
+    )
+    def test_failed_embedding_keeps_collection(self, monkeypatch, embedding_function):
+        request, vector_db_client = self.setup_memories(
+            monkeypatch, embedding_function
+        )
+
+        with pytest.raises(HTTPException) as exc_info:
+            self.reset(request)
+        assert exc_info.value.status_code == 500
+        vector_db_client.delete_collection.assert_not_called()
+        vector_db_client.upsert.assert_not_called()